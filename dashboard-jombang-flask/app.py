@@ -1,16 +1,25 @@
 import os
+import atexit
 import io
+import queue
 import re
 import sqlite3
 import threading
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from collections import Counter
+from contextlib import closing
+from functools import lru_cache
+from urllib.parse import urldefrag, urljoin
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
+import ahocorasick
+import orjson
 import requests
-from bs4 import BeautifulSoup
-from flask import Flask, render_template, jsonify, send_file, request
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
+from flask import Flask, Response, g, render_template, jsonify, send_file, request
 from wordcloud import WordCloud
-import matplotlib.pyplot as plt
 
 # ---------------------------
 # Config
@@ -23,14 +32,74 @@ app = Flask(__name__)
 # ---------------------------
 # Database helpers
 # ---------------------------
-def get_conn():
-    conn = sqlite3.connect(DB_PATH)
+def _connect():
+    # Autocommit mode; writers open explicit transactions themselves.
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
     conn.row_factory = sqlite3.Row
+    # Wait for the crawler's write lock instead of failing with "database is locked"
+    conn.execute("PRAGMA busy_timeout=5000")
     return conn
 
+# Idle reader connections reused across requests (each request runs on its own
+# thread, so per-thread connections would not survive between requests)
+_conn_pool = queue.LifoQueue(maxsize=8)
+
+def get_conn():
+    """Connection for the current app context, borrowed from the pool; returned by close_conn."""
+    if "db" not in g:
+        try:
+            g.db = _conn_pool.get_nowait()
+        except queue.Empty:
+            g.db = _connect()
+    return g.db
+
+@app.teardown_appcontext
+def close_conn(exc):
+    conn = g.pop("db", None)
+    if conn is None:
+        return
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+        _conn_pool.put_nowait(conn)
+    except (queue.Full, sqlite3.Error):
+        conn.close()
+
+# Single long-lived writer shared by the scheduler and /crawl-now;
+# hold _writer_lock around each write transaction
+_writer_conn = None
+_writer_lock = threading.RLock()
+
+def get_writer_conn():
+    """Connection used for writes (crawler inserts, schema setup)."""
+    global _writer_conn
+    with _writer_lock:
+        if _writer_conn is None:
+            conn = _connect()
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA mmap_size=268435456")
+            conn.execute("PRAGMA cache_size=-20000")
+            _writer_conn = conn
+        return _writer_conn
+
+def known_urls(urls):
+    """Return the subset of urls already stored in the articles table."""
+    if not urls:
+        return set()
+    try:
+        with closing(_connect()) as conn:
+            placeholders = ",".join("?" * len(urls))
+            rows = conn.execute(f"SELECT url FROM articles WHERE url IN ({placeholders})", list(urls)).fetchall()
+    except Exception:
+        return set()
+    return {r[0] for r in rows}
+
 def init_db():
-    conn = get_conn()
+    conn = get_writer_conn()
     cur = conn.cursor()
+    # WAL lets API readers run while the scheduler writes (persisted in the db file)
+    cur.execute("PRAGMA journal_mode=WAL")
     cur.execute("""
         CREATE TABLE IF NOT EXISTS articles (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -41,9 +110,19 @@ def init_db():
             created_at TEXT NOT NULL
         )
     """)
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_published_at ON articles(published_at)")
+    # Covers the /api/* time-window queries without touching the table
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_pub_cov ON articles(published_at DESC, title, source, url)")
+    # Superseded by idx_pub_cov, which has published_at as its leading column
+    cur.execute("DROP INDEX IF EXISTS idx_published_at")
+    # Queries compare published_at as plain text, so rewrite rows stored with a
+    # timezone suffix or in a non-ISO format to naive-UTC ISO-8601
+    cur.execute("""
+        UPDATE articles
+        SET published_at = COALESCE(strftime('%Y-%m-%dT%H:%M:%S', published_at), created_at)
+        WHERE published_at NOT GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]T*'
+           OR substr(published_at, 20) GLOB '*[+Z-]*'
+    """)
     conn.commit()
-    conn.close()
 
     # Ensure 'category' column exists (SQLite ADD COLUMN is idempotent only if missing)
     try:
@@ -53,10 +132,23 @@ def init_db():
         if 'category' not in cols:
             cur2.execute("ALTER TABLE articles ADD COLUMN category TEXT DEFAULT 'Lainnya'")
             conn2.commit()
+        # Calendar day of published_at, indexed for the /api/trend GROUP BY
+        # (ALTER TABLE only allows VIRTUAL generated columns)
+        cols = [c[1] for c in cur2.execute("PRAGMA table_xinfo(articles)").fetchall()]
+        if 'day' not in cols:
+            cur2.execute("ALTER TABLE articles ADD COLUMN day TEXT GENERATED ALWAYS AS (substr(published_at, 1, 10)) VIRTUAL")
+            conn2.commit()
+        cur2.execute("CREATE INDEX IF NOT EXISTS idx_day ON articles(day)")
+        conn2.commit()
         conn2.close()
     except Exception:
         pass
 
+    # Record whether the 'day' column made it in for /api/trend
+    global _day_expr_value
+    _day_expr_value = None
+    _day_expr(conn)
+
 # ---------------------------
 
 # ---------------------------
@@ -69,21 +161,73 @@ CATEGORY_KEYWORDS = {
     "Hukum": ["hukum", "kriminal", "polisi", "pengadilan", "kasus", "kejaksaan", "penangkapan", "sidang"]
 }
 
+# Single-pass matcher over all category keywords; values are category priorities
+_CATEGORY_NAMES = list(CATEGORY_KEYWORDS)
+_CATEGORY_AC = ahocorasick.Automaton()
+for _prio, _cat in enumerate(_CATEGORY_NAMES):
+    for _kw in CATEGORY_KEYWORDS[_cat]:
+        if _kw not in _CATEGORY_AC:
+            _CATEGORY_AC.add_word(_kw, _prio)
+_CATEGORY_AC.make_automaton()
+
 def categorize(text):
     if not text:
         return "Lainnya"
     t = text.lower()
-    for cat, kws in CATEGORY_KEYWORDS.items():
-        for kw in kws:
-            if kw in t:
-                return cat
-    return "Lainnya"
+    # Earlier categories win, as in the order of CATEGORY_KEYWORDS
+    best = min((prio for _, prio in _CATEGORY_AC.iter(t)), default=None)
+    if best is None:
+        return "Lainnya"
+    return _CATEGORY_NAMES[best]
 
 # Scrapers (add more sources as needed)
 # ---------------------------
+# Shared session so repeated requests to the same site reuse pooled keep-alive connections
+SESSION = requests.Session()
+SESSION.headers.update({"User-Agent": USER_AGENT})
+_adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16,
+                       max_retries=Retry(total=2, backoff_factor=0.3))
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
+# datetime attribute of a <time> tag, read straight from the raw article bytes
+TIME_RE = re.compile(rb'<time\b[^>]*\bdatetime=["\']([^"\']+)', re.I)
+
+# Article pages fetched concurrently per site; kept small to stay polite to
+# the regional portals (and <= the adapter's pool_maxsize)
+FETCH_WORKERS = 3
+
 def fetch(url, timeout=15):
-    headers = {"User-Agent": USER_AGENT}
-    return requests.get(url, headers=headers, timeout=timeout)
+    return SESSION.get(url, timeout=timeout)
+
+def _fetch_article(url, source, title):
+    """Fetch an article page and read its published date from the first <time> tag."""
+    pub = None
+    try:
+        rr = fetch(url)
+        rr.raise_for_status()
+        m = TIME_RE.search(rr.content)
+        if m:
+            pub = m.group(1).decode(errors="replace")
+        else:
+            # No datetime attribute; fall back to the <time> text
+            s2 = BeautifulSoup(rr.content, "lxml")
+            time_tag = s2.find("time")
+            if time_tag and time_tag.get_text(strip=True):
+                pub = time_tag.get_text(strip=True)
+    except Exception:
+        pub = datetime.utcnow().isoformat()
+    return {"title": title, "url": url, "source": source, "published_at": pub}
+
+def _fetch_articles(source, urls, titles):
+    # Skip pages we already have; save_articles would ignore them anyway
+    known = known_urls(urls)
+    pairs = [(u, t) for u, t in zip(urls, titles) if u not in known]
+    if not pairs:
+        return []
+    urls, titles = zip(*pairs)
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as ex:
+        return list(ex.map(_fetch_article, urls, [source] * len(urls), titles))
 
 def scraper_beritajombang(limit=20):
     """
@@ -96,7 +240,7 @@ def scraper_beritajombang(limit=20):
     except Exception as e:
         return []
 
-    soup = BeautifulSoup(r.text, "html.parser")
+    soup = BeautifulSoup(r.content, "lxml")
     items = []
     for a in soup.select("h2.entry-title a")[:limit]:
         title = a.get_text(strip=True)
@@ -132,7 +276,7 @@ def scraper_kabarjombang(limit=20):
     except Exception:
         return []
 
-    soup = BeautifulSoup(r.text, "html.parser")
+    soup = BeautifulSoup(r.content, "lxml")
     items = []
     # Common patterns: h2.entry-title a OR h3.post-title a
     for a in (soup.select("h2.entry-title a") + soup.select("h3.post-title a"))[:limit]:
@@ -147,6 +291,28 @@ def scraper_kabarjombang(limit=20):
         })
     return items
 
+# Month map for Indonesian names
+BULAN = {
+    "Januari": 1, "Februari": 2, "Maret": 3, "April": 4, "Mei": 5, "Juni": 6,
+    "Juli": 7, "Agustus": 8, "September": 9, "Oktober": 10, "November": 11, "Desember": 12
+}
+ID_DATE_RE = re.compile(r'(\d{1,2})\s+(' + "|".join(BULAN) + r')\s+(\d{4})')
+
+def parse_id_date(txt):
+    """Parse an Indonesian date such as "25 Agustus 2025" to ISO."""
+    if not txt:
+        return None
+    m = ID_DATE_RE.search(txt)
+    if not m:
+        return None
+    d = int(m.group(1)); mon = BULAN[m.group(2)]; y = int(m.group(3))
+    try:
+        return datetime(y, mon, d).isoformat()
+    except Exception:
+        return None
+
+# jombangkab article detail pages look like /berita/<kategori>/<slug>-<id>
+DETAIL_RE = re.compile(r"^https?://(?:www\.)?jombangkab\.go\.id/berita/[^/?#]+/[^/?#]+-\d+/?$")
 
 def scraper_jombangkab(limit=20):
     """
@@ -162,7 +328,8 @@ def scraper_jombangkab(limit=20):
     except Exception:
         return []
 
-    soup = BeautifulSoup(r.text, "html.parser")
+    # Only links are needed from the listing page; skip building the rest of the tree
+    soup = BeautifulSoup(r.content, "lxml", parse_only=SoupStrainer("a", href=True))
 
     # Gather candidate article links
     links = []
@@ -170,12 +337,12 @@ def scraper_jombangkab(limit=20):
         href = a.get("href")
         if not href:
             continue
-        # Normalize relative URLs
-        if href.startswith("/"):
-            href = "https://www.jombangkab.go.id" + href
+        # Normalize relative URLs and drop ?query/#fragment so tracking
+        # variants of one article match DETAIL_RE and dedupe to one URL
+        url = urldefrag(urljoin(base, href))[0].split("?")[0]
         # Filter only article detail pages (exclude anchors and non-article sections)
-        if "/berita/" in href and href.count("/") >= 5:  # detail pages look like /berita/<kategori>/<slug>-<id>
-            links.append(href)
+        if DETAIL_RE.match(url):
+            links.append(url)
 
     # De-duplicate preserving order
     seen = set()
@@ -185,55 +352,43 @@ def scraper_jombangkab(limit=20):
             seen.add(u)
             ordered.append(u)
     links = ordered[:limit]
+    # Only fetch articles that are not stored yet
+    known = known_urls(links)
+    links = [u for u in links if u not in known]
 
-    # Month map for Indonesian names
-    bulan = {
-        "Januari": 1, "Februari": 2, "Maret": 3, "April": 4, "Mei": 5, "Juni": 6,
-        "Juli": 7, "Agustus": 8, "September": 9, "Oktober": 10, "November": 11, "Desember": 12
-    }
-
-    items = []
-
-    # Helper to parse "25 Agustus 2025" to ISO
-    def parse_id_date(txt):
-        if not txt:
-            return None
-        m = re.search(r'(\\d{1,2})\\s+(Januari|Februari|Maret|April|Mei|Juni|Juli|Agustus|September|Oktober|November|Desember)\\s+(\\d{4})', txt)
-        if not m:
-            return None
-        d = int(m.group(1)); mon = bulan[m.group(2)]; y = int(m.group(3))
-        try:
-            return datetime(y, mon, d).isoformat()
-        except Exception:
-            return None
-
-    for url in links:
+    def fetch_detail(url):
         try:
             rr = fetch(url)
             rr.raise_for_status()
         except Exception:
-            continue
+            return None
 
-        art = BeautifulSoup(rr.text, "html.parser")
+        art = BeautifulSoup(rr.content, "lxml")
         # Try common heading tags in this portal
         title_tag = art.find(["h1", "h2", "h3"])
         title = title_tag.get_text(strip=True) if title_tag else None
 
-        # The date appears near the title; also try any element text containing Indonesian month
+        # The date appears near the title: scan the title's container for
+        # "25 Agustus 2025" first, and only fall back to the whole page
         pub = None
-        # scan for a line that looks like "25 Agustus 2025"
-        txt = art.get_text(" ", strip=True)
-        pub = parse_id_date(txt)
+        if title_tag and title_tag.parent:
+            pub = parse_id_date(title_tag.parent.get_text(" ", strip=True))
+        if not pub:
+            pub = parse_id_date(art.get_text(" ", strip=True))
         if not pub:
             pub = datetime.utcnow().isoformat()
 
         if title and url:
-            items.append({
+            return {
                 "title": title,
                 "url": url,
                 "source": "jombangkab.go.id",
                 "published_at": pub
-            })
+            }
+        return None
+
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as ex:
+        items = [it for it in ex.map(fetch_detail, links) if it]
 
     return items
 
@@ -250,29 +405,16 @@ def scraper_detik(limit=20):
         r.raise_for_status()
     except Exception:
         return []
-    soup = BeautifulSoup(r.text, "html.parser")
-    items = []
+    soup = BeautifulSoup(r.content, "lxml")
+    urls, titles = [], []
     for a in soup.select("article.search-result a")[:limit]:
         href = a.get("href")
         if not href:
             continue
-        url = href if href.startswith("http") else "https://www.detik.com" + href
-        title = a.get_text(strip=True)
-        # try to fetch article to get date
-        pub = None
-        try:
-            rr = fetch(url)
-            rr.raise_for_status()
-            s2 = BeautifulSoup(rr.text, "html.parser")
-            time_tag = s2.find("time")
-            if time_tag and time_tag.get("datetime"):
-                pub = time_tag["datetime"]
-            elif time_tag and time_tag.get_text(strip=True):
-                pub = time_tag.get_text(strip=True)
-        except Exception:
-            pub = datetime.utcnow().isoformat()
-        items.append({"title": title, "url": url, "source": "detik.com", "published_at": pub})
-    return items
+        urls.append(urljoin(base, href))
+        titles.append(a.get_text(strip=True))
+    # fetch articles concurrently to get their dates
+    return _fetch_articles("detik.com", urls, titles)
 
 def scraper_tribunjatim(limit=20):
     base = "https://jatim.tribunnews.com/tag/jombang"
@@ -281,29 +423,15 @@ def scraper_tribunjatim(limit=20):
         r.raise_for_status()
     except Exception:
         return []
-    soup = BeautifulSoup(r.text, "html.parser")
-    items = []
+    soup = BeautifulSoup(r.content, "lxml")
+    urls, titles = [], []
     for a in soup.select("h3.post-title a, h2.post-title a")[:limit]:
         href = a.get("href")
         if not href:
             continue
-        url = href if href.startswith("http") else "https://jatim.tribunnews.com" + href
-        title = a.get_text(strip=True)
-        pub = None
-        # try article page
-        try:
-            rr = fetch(url)
-            rr.raise_for_status()
-            s2 = BeautifulSoup(rr.text, "html.parser")
-            time_tag = s2.find("time")
-            if time_tag and time_tag.get("datetime"):
-                pub = time_tag["datetime"]
-            elif time_tag and time_tag.get_text(strip=True):
-                pub = time_tag.get_text(strip=True)
-        except Exception:
-            pub = datetime.utcnow().isoformat()
-        items.append({"title": title, "url": url, "source": "tribunjatim", "published_at": pub})
-    return items
+        urls.append(urljoin(base, href))
+        titles.append(a.get_text(strip=True))
+    return _fetch_articles("tribunjatim", urls, titles)
 
 def scraper_wartajombang(limit=20):
     base = "https://wartajombang.com/"
@@ -312,139 +440,130 @@ def scraper_wartajombang(limit=20):
         r.raise_for_status()
     except Exception:
         return []
-    soup = BeautifulSoup(r.text, "html.parser")
-    items = []
+    soup = BeautifulSoup(r.content, "lxml")
+    urls, titles = [], []
     for a in soup.select("h2.entry-title a, .post-title a")[:limit]:
         href = a.get("href")
         if not href:
             continue
-        url = href if href.startswith("http") else "https://wartajombang.com" + href
-        title = a.get_text(strip=True)
-        pub = None
-        try:
-            rr = fetch(url)
-            rr.raise_for_status()
-            s2 = BeautifulSoup(rr.text, "html.parser")
-            time_tag = s2.find("time")
-            if time_tag and time_tag.get("datetime"):
-                pub = time_tag["datetime"]
-            elif time_tag and time_tag.get_text(strip=True):
-                pub = time_tag.get_text(strip=True)
-        except Exception:
-            pub = datetime.utcnow().isoformat()
-        items.append({"title": title, "url": url, "source": "wartajombang", "published_at": pub})
-    return items
+        urls.append(urljoin(base, href))
+        titles.append(a.get_text(strip=True))
+    return _fetch_articles("wartajombang", urls, titles)
 SCRAPERS = [scraper_beritajombang, scraper_kabarjombang, scraper_jombangkab, scraper_detik, scraper_tribunjatim, scraper_wartajombang]
 
+DATE_FORMATS = [
+    "%Y-%m-%dT%H:%M:%S%z",
+    "%Y-%m-%dT%H:%M:%S",
+    "%d %B %Y",
+    "%d/%m/%Y",
+    "%Y-%m-%d"
+]
+
 def normalize_datetime(dt_str):
+    # Most values are ISO-8601 (utcnow().isoformat() or <time datetime=...>);
+    # fromisoformat is much cheaper than trying each strptime format
+    if dt_str and len(dt_str) >= 10 and dt_str[4] == "-" and dt_str[7] == "-":
+        try:
+            return datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
+        except ValueError:
+            pass
     # Try parse multiple date formats; fallback to now
-    candidates = [
-        "%Y-%m-%dT%H:%M:%S%z",
-        "%Y-%m-%dT%H:%M:%S",
-        "%d %B %Y",
-        "%d/%m/%Y",
-        "%Y-%m-%d"
-    ]
-    for fmt in candidates:
+    for fmt in DATE_FORMATS:
         try:
             return datetime.strptime(dt_str, fmt)
         except Exception:
             continue
     return datetime.utcnow()
 
-def save_articles(articles):
-    conn = get_conn()
-    cur = conn.cursor()
-    added = 0
-    for a in articles:
-        try:
-            pub_dt = normalize_datetime(a.get("published_at") or "")
-            cur.execute("""
-                INSERT OR IGNORE INTO articles (title, url, source, published_at, created_at, category)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                a["title"],
-                a["url"],
-                a["source"],
-                pub_dt.isoformat(),
-                datetime.utcnow().isoformat()
-            ))
-            if cur.rowcount > 0:
-                added += 1
-        except Exception:
-            continue
-    conn.commit()
-    conn.close()
-    return added
-
+def to_utc_iso(dt_str):
+    """Normalize a scraped date string to naive-UTC ISO-8601, which sorts lexicographically."""
+    dt = normalize_datetime(dt_str)
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt.isoformat()
 
 def save_articles(items):
     """Save list of items (dict with title,url,source,published_at). Adds category before insert."""
     if not items:
         return 0
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    total = 0
+    now_iso = datetime.utcnow().isoformat()
+    rows = []
     for a in items:
         title = a.get("title")
         url = a.get("url")
+        if not title or not url:
+            continue
         source = a.get("source", "")
-        pub = a.get("published_at", datetime.utcnow().isoformat())
-        cat = categorize(title + " " + a.get("summary","") if a.get("summary") else title)
+        pub = a.get("published_at")
+        pub = to_utc_iso(pub) if pub else now_iso
+        summary = a.get("summary")
+        cat = categorize(title + " " + summary if summary else title)
+        rows.append((title, url, source, pub, now_iso, cat))
+    if not rows:
+        return 0
+    conn = get_writer_conn()
+    # One write transaction for the whole batch instead of one per article
+    with _writer_lock:
+        cur = conn.cursor()
         try:
-            cur.execute("""
+            cur.execute("BEGIN IMMEDIATE")
+            cur.executemany("""
                 INSERT OR IGNORE INTO articles (title, url, source, published_at, created_at, category)
                 VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                title,
-                url,
-                source,
-                pub,
-                datetime.utcnow().isoformat(),
-                cat
-            ))
-            if cur.rowcount:
-                total += 1
+            """, rows)
+            total = cur.rowcount
+            conn.commit()
         except Exception:
-            continue
-    conn.commit()
-    conn.close()
+            conn.rollback()
+            total = 0
     return total
 
 def crawl_all():
     total = 0
-    for s in SCRAPERS:
-        try:
-            items = s()
-            total += save_articles(items)
-        except Exception:
-            continue
+    # Scrapers run concurrently; inserts stay on this thread so writes are serialized
+    with ThreadPoolExecutor(max_workers=len(SCRAPERS)) as ex:
+        futures = [ex.submit(s) for s in SCRAPERS]
+        for fut in as_completed(futures):
+            try:
+                total += save_articles(fut.result())
+            except Exception:
+                continue
     return total
 
 # ---------------------------
-# Simple background scheduler (thread + sleep loop)
+# Simple background scheduler (thread + hourly wait)
 # ---------------------------
 _crawl_thread = None
-_stop_flag = False
+_stop_event = threading.Event()
+_scheduler_lock = threading.Lock()
 
 def scheduler_loop():
-    import time
-    while not _stop_flag:
+    while not _stop_event.is_set():
         try:
             crawl_all()
         except Exception:
             pass
-        # sleep 1 hour
-        for _ in range(3600):
-            if _stop_flag:
-                break
-            time.sleep(1)
+        # sleep 1 hour, waking immediately on stop_scheduler()
+        _stop_event.wait(timeout=3600)
 
 def start_scheduler():
     global _crawl_thread
-    if _crawl_thread is None:
-        _crawl_thread = threading.Thread(target=scheduler_loop, daemon=True)
-        _crawl_thread.start()
+    with _scheduler_lock:
+        if _crawl_thread is None:
+            _stop_event.clear()
+            _crawl_thread = threading.Thread(target=scheduler_loop, daemon=True)
+            _crawl_thread.start()
+
+def stop_scheduler(timeout=2):
+    # Bounded join: a crawl in progress must not hold up exit (the thread is a daemon)
+    global _crawl_thread
+    with _scheduler_lock:
+        _stop_event.set()
+        if _crawl_thread is not None:
+            _crawl_thread.join(timeout=timeout)
+            _crawl_thread = None
+
+atexit.register(stop_scheduler)
 
 # ---------------------------
 # Text processing helpers (simple Indonesian stopwords)
@@ -453,110 +572,155 @@ ID_STOPWORDS = set("""
 yang dan di ke dari untuk dengan pada adalah itu ini atau juga tidak karena sebagai dalam akan oleh sudah bisa kami kita mereka saya aku ia para serta hanya lebih masih agar namun sehingga telah pun suatu tiap kepada tanpa antara kalau bila jadi tentang sebuah lah kah si punya ada bukan supaya saat sedang belum baru lama usai kemudian lalu maka hingga setelah sebelum meski meskipun jika ketika dimana demi per atas bawah
 """.split())
 
-TOKEN_RE = re.compile(r"[A-Za-zÀ-ÖØ-öø-ÿ\u00C0-\u024F\u1E00-\u1EFF\u0100-\u017F\u0180-\u024F]+", re.UNICODE)
+# Runs of letters (word characters minus digits and underscore)
+TOKEN_RE = re.compile(r"[^\W\d_]+", re.UNICODE)
 
 def tokenize(text):
-    return [t.lower() for t in TOKEN_RE.findall(text or "")]
+    # Casefold the whole string once rather than each token
+    return TOKEN_RE.findall((text or "").casefold())
 
 def top_keywords(rows, k=15):
-    counter = Counter()
-    for r in rows:
-        title = r["title"] if isinstance(r, sqlite3.Row) else r.get("title")
-        toks = [t for t in tokenize(title) if t not in ID_STOPWORDS and len(t) > 2]
-        counter.update(toks)
+    # Tokenize all titles in one pass instead of one findall/update per row
+    joined = " ".join((r["title"] if isinstance(r, sqlite3.Row) else r.get("title")) or "" for r in rows)
+    counter = Counter(t for t in tokenize(joined) if len(t) > 2 and t not in ID_STOPWORDS)
     return counter.most_common(k)
 
 # ---------------------------
-# Routes
+# Queries
 # ---------------------------
-@app.route("/")
-def index():
-    return render_template("index.html")
-
-@app.route("/api/articles")
-def api_articles():
-    days = int(request.args.get("days", 7))
-    since = datetime.utcnow() - timedelta(days=days)
-    conn = get_conn()
+# Plain functions over an open connection, shared by the JSON routes and
+# the PDF export.
+def _query_articles(conn, days, today):
+    since = today - timedelta(days=days)
     cur = conn.cursor()
     cur.execute("""
         SELECT title, url, source, published_at
         FROM articles
-        WHERE datetime(published_at) >= datetime(?)
-        ORDER BY datetime(published_at) DESC
+        WHERE published_at >= ?
+        ORDER BY published_at DESC
         LIMIT 500
     """, (since.isoformat(),))
-    rows = [dict(r) for r in cur.fetchall()]
-    conn.close()
-    return jsonify(rows)
-
-@app.route("/api/trend")
-def api_trend():
-    days = int(request.args.get("days", 7))
-    since = datetime.utcnow() - timedelta(days=days)
-    conn = get_conn()
+    return [dict(r) for r in cur.fetchall()]
+
+# Decided once: by init_db after its migrations, or on first use otherwise
+_day_expr_value = None
+
+def _day_expr(conn):
+    # The generated 'day' column needs SQLite >= 3.31; init_db skips it on
+    # older versions, so fall back to the expression it is defined as
+    global _day_expr_value
+    if _day_expr_value is None:
+        cols = [c[1] for c in conn.execute("PRAGMA table_xinfo(articles)").fetchall()]
+        _day_expr_value = "articles.day" if "day" in cols else "substr(articles.published_at, 1, 10)"
+    return _day_expr_value
+
+def _query_trend(conn, days, today):
+    since = today - timedelta(days=days)
     cur = conn.cursor()
-    cur.execute("""
-        SELECT substr(published_at, 1, 10) as d, COUNT(*) as c
-        FROM articles
-        WHERE datetime(published_at) >= datetime(?)
-        GROUP BY d
-        ORDER BY d ASC
-    """, (since.isoformat(),))
+    # One row per day from since to today; days without articles count 0
+    cur.execute(f"""
+        WITH RECURSIVE span(d) AS (
+            SELECT ?
+            UNION ALL
+            SELECT date(d, '+1 day') FROM span WHERE d < ?
+        )
+        SELECT span.d as d, COUNT(articles.id) as c
+        FROM span
+        LEFT JOIN articles ON {_day_expr(conn)} = span.d
+        GROUP BY span.d
+        ORDER BY span.d ASC
+    """, (since.isoformat(), today.isoformat()))
     data = cur.fetchall()
-    conn.close()
-    labels = []
-    counts = []
-    # Fill missing days
-    day_iter = [since.date() + timedelta(days=i) for i in range(days+1)]
-    map_counts = {row["d"]: row["c"] for row in data}
-    for d in day_iter:
-        labels.append(d.isoformat())
-        counts.append(int(map_counts.get(d.isoformat(), 0)))
-    return jsonify({"labels": labels, "counts": counts})
+    return {"labels": [row["d"] for row in data], "counts": [row["c"] for row in data]}
 
-@app.route("/api/keywords")
-def api_keywords():
-    days = int(request.args.get("days", 7))
-    since = datetime.utcnow() - timedelta(days=days)
-    conn = get_conn()
+def _query_recent_titles(conn, days, today):
+    since = today - timedelta(days=days)
     cur = conn.cursor()
     cur.execute("""
         SELECT title FROM articles
-        WHERE datetime(published_at) >= datetime(?)
+        WHERE published_at >= ?
         ORDER BY published_at DESC
         LIMIT 1000
     """, (since.isoformat(),))
-    rows = cur.fetchall()
-    conn.close()
-    pairs = top_keywords(rows, k=20)
-    return jsonify({"labels": [p[0] for p in pairs], "counts": [int(p[1]) for p in pairs]})
+    return cur.fetchall()
 
-@app.route("/wordcloud.png")
-def wordcloud_image():
+def _query_keywords(conn, days, today):
+    pairs = top_keywords(_query_recent_titles(conn, days, today), k=20)
+    return {"labels": [p[0] for p in pairs], "counts": [int(p[1]) for p in pairs]}
+
+# ---------------------------
+# Cached aggregations
+# ---------------------------
+# Results only change when the crawler inserts rows or the UTC day rolls over,
+# so they are memoized on (days, MAX(id), today). Windows start at midnight
+# UTC `days` days ago to keep the key stable within a day.
+def _latest_id():
+    latest = get_conn().execute("SELECT MAX(id) FROM articles").fetchone()[0]
+    return latest or 0
+
+def ojson(obj):
+    """JSON response serialized with orjson (faster than jsonify for row lists)."""
+    return Response(orjson.dumps(obj), mimetype="application/json")
+
+def _conditional(build):
+    """ETag-tagged response for the current ?days window.
+
+    The tag uses the same key as the caches. A client that already holds it
+    gets an empty 304; otherwise build(days, latest_id, today) makes the body.
+    """
     days = int(request.args.get("days", 7))
-    since = datetime.utcnow() - timedelta(days=days)
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT title FROM articles
-        WHERE datetime(published_at) >= datetime(?)
-        ORDER BY published_at DESC
-        LIMIT 1000
-    """, (since.isoformat(),))
-    titles = " ".join([r["title"] for r in cur.fetchall()])
-    conn.close()
+    latest_id, today = _latest_id(), datetime.utcnow().date()
+    etag = f"{latest_id}:{days}:{today.isoformat()}"
+    if request.if_none_match.contains(etag):
+        resp = Response(status=304)
+    else:
+        resp = build(days, latest_id, today)
+    resp.set_etag(etag)
+    return resp
+
+@lru_cache(maxsize=32)
+def _trend(days, latest_id, today):
+    return _query_trend(get_conn(), days, today)
+
+@lru_cache(maxsize=32)
+def _keywords(days, latest_id, today):
+    return _query_keywords(get_conn(), days, today)
+
+@lru_cache(maxsize=32)
+def _wordcloud_png_bytes(days, latest_id, today):
+    titles = " ".join([r["title"] for r in _query_recent_titles(get_conn(), days, today)])
 
     wc = WordCloud(width=1200, height=600, background_color="white").generate(titles or "Jombang")
     buf = io.BytesIO()
-    plt.figure(figsize=(10,5))
-    plt.imshow(wc, interpolation="bilinear")
-    plt.axis("off")
-    plt.tight_layout(pad=0)
-    plt.savefig(buf, format="png", bbox_inches="tight")
-    plt.close()
-    buf.seek(0)
-    return send_file(buf, mimetype="image/png")
+    wc.to_image().save(buf, format="PNG", optimize=False)
+    return buf.getvalue()
+
+# ---------------------------
+# Routes
+# ---------------------------
+@app.route("/")
+def index():
+    return render_template("index.html")
+
+@app.route("/api/articles")
+def api_articles():
+    return _conditional(lambda days, latest_id, today: ojson(_query_articles(get_conn(), days, today)))
+
+@app.route("/api/trend")
+def api_trend():
+    return _conditional(lambda days, latest_id, today: ojson(_trend(days, latest_id, today)))
+
+@app.route("/api/keywords")
+def api_keywords():
+    return _conditional(lambda days, latest_id, today: ojson(_keywords(days, latest_id, today)))
+
+@app.route("/wordcloud.png")
+def wordcloud_image():
+    resp = _conditional(lambda days, latest_id, today: Response(
+        _wordcloud_png_bytes(days, latest_id, today), mimetype="image/png"))
+    resp.cache_control.public = True
+    resp.cache_control.max_age = 300
+    return resp
 
 @app.route("/export-pdf")
 def export_pdf():
@@ -567,13 +731,14 @@ def export_pdf():
 
     days = int(request.args.get("days", 7))
 
-    # Fetch data
-    arts = api_articles().json
-    trend = api_trend().json
-    keywords = api_keywords().json
+    # Fetch data over the request's connection
+    today = datetime.utcnow().date()
+    conn = get_conn()
+    trend = _query_trend(conn, days, today)
+    keywords = _query_keywords(conn, days, today)
 
     buf = io.BytesIO()
-    c = canvas.Canvas(buf, pagesize=A4)
+    c = canvas.Canvas(buf, pagesize=A4, pageCompression=1)
     w, h = A4
 
     c.setFont("Helvetica-Bold", 14)